@@ -0,0 +1,21 @@
+"""Gunicorn settings for the shop analyzer, picked up by `gunicorn app:app`."""
+import multiprocessing
+import os
+
+# Loopback only: nginx (deploy/nginx.conf) adds CORS headers and upload limits
+# in front of the app, so it must be the only thing that reaches this port.
+# Set BIND (e.g. 0.0.0.0:5001) only when the network already keeps clients out.
+bind = os.environ.get("BIND") or f"127.0.0.1:{os.environ.get('PORT', '5001')}"
+
+# Every worker runs its own asyncio event loop (uvloop when installed), so a
+# single process keeps hundreds of Gemini calls in flight; one worker per core
+# uses the whole machine.
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Gemini analyses can take tens of seconds on large photos
+timeout = 120
+
+# Import app.py (prompt, Gemini model, schema check) once in the master and
+# fork workers from it, instead of every worker initializing on its own
+preload_app = True
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+with mock.patch("psycopg.connect"):
+    import app
+
+
+class FakeCursor:
+    """Returns sequential shop IDs; the first executemany() blocks until released."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.ids = []
+
+    def executemany(self, query, params, returning=False):
+        if not self.pool.started.is_set():
+            self.pool.started.set()
+            self.pool.release.wait(5)
+        for _ in params:
+            self.pool.next_id += 1
+            self.ids.append(self.pool.next_id)
+
+    def fetchone(self):
+        return (self.ids[0],)
+
+    def nextset(self):
+        self.ids.pop(0)
+        return bool(self.ids) or None
+
+
+class FakePool:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.next_id = 0
+
+    @contextmanager
+    def connection(self):
+        conn = mock.MagicMock()
+        conn.cursor.return_value.__enter__.return_value = FakeCursor(self)
+        yield conn
+
+
+@pytest.fixture
+def shop_writer(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(app, "db_pool", pool)
+    thread = threading.Thread(target=app.shop_writer, daemon=True)
+    thread.start()
+    yield pool
+    app.shop_queue.put(None)
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def submit(index):
+    return asyncio.wrap_future(app.store_shop_data({"n": index}, {}, None))
+
+
+def test_cancelled_waiter_does_not_stop_writer(shop_writer):
+    async def scenario():
+        first = asyncio.ensure_future(submit(1))
+        assert await asyncio.to_thread(shop_writer.started.wait, 5)
+
+        # Queued behind the blocked batch, then abandoned by its request;
+        # wrap_future passes the cancellation on from a loop callback
+        queued = app.store_shop_data({"n": 2}, {}, None)
+        asyncio.wrap_future(queued).cancel()
+        await asyncio.sleep(0)
+        assert queued.cancelled()
+
+        shop_writer.release.set()
+        assert await asyncio.wait_for(first, 5) == 1
+        assert await asyncio.wait_for(submit(3), 5) == 2
+
+    asyncio.run(scenario())